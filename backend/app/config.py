@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import os
-from functools import lru_cache
+import re
+from types import MappingProxyType
+from functools import cached_property, lru_cache
 from typing import Literal
 
 from pydantic import SecretStr, field_validator, model_validator
@@ -57,11 +59,22 @@ class Settings(BaseSettings):
             return ["*"]
         return [o.strip() for o in self.allowed_origins.split(",") if o.strip()]
 
+    @cached_property
+    def cors_origin_regex(self) -> re.Pattern[str] | None:
+        """ngrok tunnel origins — unnecessary (and skipped) when "*" already allows all."""
+        if self.allowed_origins == "*":
+            return None
+        return re.compile(r"https://.*\.ngrok(-free)?\.app", re.ASCII)
+
     # ── Database ──────────────────────────────────────────────────────────────
     # REQUIRED — must be explicit so Docker vs local paths are never conflated.
     # Local dev:  sqlite+aiosqlite:///./spaceforge.db
     # Docker:     sqlite+aiosqlite:////app/data/spaceforge.db
     database_url: str
+    # Connection pool — sized for concurrent request bursts.
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_recycle: int = 3600  # seconds
 
     # ── Storage ───────────────────────────────────────────────────────────────
     static_dir: str = "app/static"
@@ -69,23 +82,31 @@ class Settings(BaseSettings):
     models_subdir: str = "models"
     uploads_subdir: str = "uploads"
     upload_max_mb: int = 10
+    # Render jobs allowed to run at once; the rest wait as "pending".
+    max_concurrent_renders: int = 4
 
-    @property
+    @cached_property
     def renders_dir(self) -> str:
         return os.path.join(self.static_dir, self.renders_subdir)
 
-    @property
+    @cached_property
     def models_dir(self) -> str:
         return os.path.join(self.static_dir, self.models_subdir)
 
-    @property
+    @cached_property
     def uploads_dir(self) -> str:
         return os.path.join(self.static_dir, self.uploads_subdir)
 
+    @cached_property
+    def upload_max_bytes(self) -> int:
+        return self.upload_max_mb * 1024 * 1024
+
     # ── AI Provider ───────────────────────────────────────────────────────────
     # Options: fake | groq
     # groq = https://console.groq.com (fast LLaMA/Mixtral inference, free tier)
     ai_provider: Literal["fake", "groq"] = "fake"
+    # Simulated per-call latency for the fake provider; 0 = respond instantly.
+    fake_latency_ms: int = 0
 
     # Groq — https://console.groq.com/keys
     groq_api_key: SecretStr = SecretStr("")
@@ -93,6 +114,8 @@ class Settings(BaseSettings):
     groq_model: str = "llama-3.3-70b-versatile"
     # Best vision model on Groq (Feb 2026) — used for room image analysis
     groq_vision_model: str = "meta-llama/llama-4-scout-17b-16e-instruct"
+    # Max in-flight Groq requests from one batch pipeline (free-tier rate limits)
+    groq_max_concurrent: int = 4
 
     # ── Cross-field validation ────────────────────────────────────────────────
     @model_validator(mode="after")
@@ -105,16 +128,17 @@ class Settings(BaseSettings):
             )
         return self
 
-    def safe_dump(self) -> dict:
+    @cached_property
+    def safe_config(self) -> MappingProxyType:
         """
-        Loggable config dict with all secrets redacted.
+        Read-only loggable config with all secrets redacted — built once.
         Always use this in startup logs — never model_dump() directly.
         """
         d = self.model_dump()
         for field in ("secret_key", "groq_api_key"):
             if field in d:
                 d[field] = "[REDACTED]"
-        return d
+        return MappingProxyType(d)
 
 
 @lru_cache
@@ -2,19 +2,51 @@
 
 from __future__ import annotations
 
+import logging
+
+import orjson
+from sqlalchemy import event, inspect, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import get_settings
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
+_IS_SQLITE = settings.database_url.startswith("sqlite")
+
 engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
     connect_args={"check_same_thread": False},
+    # aiosqlite defaults to NullPool (a fresh connection per checkout) for file
+    # DBs — use a real bounded pool so bursts reuse connections instead of stalling.
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=True,
+    # JSON columns (analysis/design payloads) round-trip through orjson.
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
 )
 
+
+if _IS_SQLITE:
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+        """WAL lets readers proceed while a writer holds the lock."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-64000")  # ~64 MB page cache
+        cursor.close()
+
+
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
@@ -28,13 +60,60 @@ class Base(DeclarativeBase):
     pass
 
 
+# UUID columns that were dashed VARCHAR(36) strings before the switch to the
+# native Uuid type (stored as 32 hex chars on SQLite).
+_LEGACY_UUID_COLUMNS: dict[str, tuple[str, ...]] = {
+    "rooms": ("id",),
+    "designs": ("id", "room_id"),
+    "render_jobs": ("id", "design_id"),
+}
+
+
+def upgrade_legacy_schema(sync_conn) -> None:
+    """
+    Bring a database created with the old VARCHAR(36) id layout up to date.
+    create_all() leaves existing tables alone, so without this old rows can't
+    be found (lookups bind 32-char hex, stored ids are dashed).
+
+    SQLite: rewrite dashed ids in place (idempotent) and add missing indexes.
+    Other databases: refuse to start — see "Upgrading an existing database" in the README.
+    """
+    inspector = inspect(sync_conn)
+    if "rooms" not in inspector.get_table_names():
+        return
+    id_type = next(c["type"] for c in inspector.get_columns("rooms") if c["name"] == "id")
+    if getattr(id_type, "length", None) != 36:
+        return  # current layout
+
+    if sync_conn.dialect.name != "sqlite":
+        raise RuntimeError(
+            "Database uses the legacy VARCHAR(36) id layout. Convert the id/room_id/design_id "
+            "columns to UUID before starting (see README: Upgrading an existing database)."
+        )
+
+    rewritten = 0
+    for table, columns in _LEGACY_UUID_COLUMNS.items():
+        for column in columns:
+            result = sync_conn.execute(text(
+                f"UPDATE {table} SET {column} = lower(replace({column}, '-', '')) "
+                f"WHERE {column} LIKE '%-%'"
+            ))
+            rewritten += result.rowcount
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+    if rewritten:
+        logger.warning("Upgraded legacy database: rewrote %d dashed id values", rewritten)
+
+
 async def init_db() -> None:
-    """Create all tables on startup."""
+    """Create all tables on startup and upgrade a legacy-layout database."""
     async with engine.begin() as conn:
         # Import models so they are registered on Base.metadata
         from app.models import db_models  # noqa: F401
 
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade_legacy_schema)
 
 
 async def get_db() -> AsyncSession:  # type: ignore[return]
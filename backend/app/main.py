@@ -2,19 +2,25 @@
 
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
+import re
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+import httpx
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.responses import Response
+from starlette.types import Scope
 
 from app.config import get_settings
 from app.database import init_db
 from app.models.schemas import HealthResponse
 from app.routers import agent, ar, designs, rooms
+from app.services.ai_provider import close_ai_provider
 
 logging.basicConfig(
     level=logging.DEBUG if False else logging.INFO,  # overridden below after settings load
@@ -33,7 +39,8 @@ logging.getLogger().setLevel(settings.log_level)
 async def lifespan(app: FastAPI):
     # ── Startup ──
     logger.info("Starting %s v%s", settings.app_name, settings.app_version)
-    logger.info("Config: %s", settings.safe_dump())
+
+    logger.info("Config: %s", dict(settings.safe_config))
 
     if settings.allowed_origins == "*" and not settings.debug:
         logger.warning(
@@ -62,10 +69,21 @@ async def lifespan(app: FastAPI):
     logger.info("Database initialised")
 
     _copy_placeholder_model()
+    app.state.spa_index = _load_spa_index()
+
+    # One pooled HTTP client for all outbound AI calls — connections and TLS
+    # sessions are reused across requests instead of rebuilt per provider.
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(60.0, connect=5.0),
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    )
 
     yield
 
     # ── Shutdown ──
+    await close_ai_provider()
+    await app.state.http.aclose()
     logger.info("SpaceForge API shutting down")
 
 
@@ -91,6 +109,7 @@ app = FastAPI(
     version=settings.app_version,
     description="AI-powered interior design & AR placement platform.",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     # Disable docs in production (set DEBUG=true to re-enable)
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
@@ -102,7 +121,7 @@ app = FastAPI(
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
-    allow_origin_regex=r"https://.*\.ngrok(-free)?\.app",
+    allow_origin_regex=settings.cors_origin_regex,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -110,7 +129,30 @@ app.add_middleware(
 
 # ── Static files ──────────────────────────────────────────────────────────────
 
-app.mount("/static", StaticFiles(directory=settings.static_dir), name="static")
+class _StaticFiles(StaticFiles):
+    """
+    StaticFiles that marks versioned AR model files as immutable for browser caching.
+    Only names carrying a content hash or version (room.3f9a1c2e.glb, room.v2.glb)
+    qualify — fixed names like room_default.glb can change in place, so they keep
+    the default ETag/Last-Modified revalidation.
+    """
+
+    _IMMUTABLE_PREFIX = settings.models_subdir + os.sep
+    _VERSIONED_NAME = re.compile(r"\.(?:[0-9a-f]{8,}|v\d+)\.[A-Za-z0-9]+$")
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        # 304 revalidations carry the header too, so caches keep treating it as immutable.
+        if (
+            response.status_code in (200, 304)
+            and path.startswith(self._IMMUTABLE_PREFIX)
+            and self._VERSIONED_NAME.search(path)
+        ):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+app.mount("/static", _StaticFiles(directory=settings.static_dir), name="static")
 
 # ── API Routers ───────────────────────────────────────────────────────────────
 
@@ -133,11 +175,26 @@ async def health() -> HealthResponse:
 _FRONTEND_DIST = os.path.join(os.path.dirname(__file__), "..", "frontend_dist")
 
 
-@app.get("/{full_path:path}", include_in_schema=False)
-async def serve_spa(full_path: str):
+def _load_spa_index() -> tuple[bytes, str] | None:
+    """Read index.html once at startup → (html, ETag), or None if the frontend isn't built."""
     index = os.path.join(_FRONTEND_DIST, "index.html")
-    if os.path.exists(index):
-        return FileResponse(index)
+    if not os.path.exists(index):
+        return None
+    with open(index, "rb") as f:
+        html = f.read()
+    etag = f'"{hashlib.blake2b(html, digest_size=8).hexdigest()}"'
+    logger.info("SPA index loaded from %s", index)
+    return html, etag
+
+
+@app.get("/{full_path:path}", include_in_schema=False)
+async def serve_spa(full_path: str, request: Request):
+    spa_index = request.app.state.spa_index
+    if spa_index is not None:
+        html, etag = spa_index
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(html, media_type="text/html", headers={"ETag": etag})
     return JSONResponse(
         status_code=200,
         content={
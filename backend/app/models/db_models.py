@@ -5,7 +5,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import JSON, DateTime, ForeignKey, Index, String, Text, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -15,17 +15,13 @@ def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def _new_id() -> str:
-    return str(uuid.uuid4())
-
-
 class Room(Base):
     __tablename__ = "rooms"
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_new_id)
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
     filename: Mapped[str] = mapped_column(String(255))
     file_url: Mapped[str | None] = mapped_column(String(512), nullable=True)
-    analysis_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    analysis_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
 
     designs: Mapped[list[Design]] = relationship("Design", back_populates="room", cascade="all, delete-orphan")
@@ -33,26 +29,30 @@ class Room(Base):
 
 class Design(Base):
     __tablename__ = "designs"
+    __table_args__ = (Index("ix_designs_room_id_created", "room_id", "created_at"),)
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_new_id)
-    room_id: Mapped[str] = mapped_column(String(36), ForeignKey("rooms.id"))
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    room_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("rooms.id"))
     style: Mapped[str | None] = mapped_column(String(100), nullable=True)
-    design_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    design_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
 
-    room: Mapped[Room] = relationship("Room", back_populates="designs")
+    # Parents are never needed on the request path — fail loudly instead of
+    # issuing a hidden per-row lazy load (which also breaks under asyncio).
+    room: Mapped[Room] = relationship("Room", back_populates="designs", lazy="raise")
     render_jobs: Mapped[list[RenderJob]] = relationship("RenderJob", back_populates="design", cascade="all, delete-orphan")
 
 
 class RenderJob(Base):
     __tablename__ = "render_jobs"
+    __table_args__ = (Index("ix_renderjobs_design_id", "design_id"),)
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_new_id)
-    design_id: Mapped[str] = mapped_column(String(36), ForeignKey("designs.id"))
-    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending | processing | done | failed
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    design_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("designs.id"))
+    status: Mapped[str] = mapped_column(String(20), default="pending", index=True)  # pending | processing | done | failed
     image_url: Mapped[str | None] = mapped_column(String(512), nullable=True)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
 
-    design: Mapped[Design] = relationship("Design", back_populates="render_jobs")
+    design: Mapped[Design] = relationship("Design", back_populates="render_jobs", lazy="raise")
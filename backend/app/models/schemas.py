@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from typing import Any
+from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -32,7 +33,7 @@ class RoomAnalysis(BaseModel):
 
 
 class RoomAnalyzeResponse(BaseSchema):
-    room_id: str
+    room_id: UUID
     filename: str
     file_url: str | None
     analysis: RoomAnalysis
@@ -57,14 +58,14 @@ class FurniturePiece(BaseModel):
 
 
 class DesignGenerateRequest(BaseModel):
-    room_id: str
+    room_id: UUID
     style: str = Field(default="modern", description="Desired interior style")
     preferences: dict[str, Any] = Field(default_factory=dict)
 
 
 class DesignGenerateResponse(BaseSchema):
-    design_id: str
-    room_id: str
+    design_id: UUID
+    room_id: UUID
     style: str
     furniture: list[FurniturePiece]
     layout_notes: str
@@ -76,12 +77,12 @@ class DesignGenerateResponse(BaseSchema):
 # ── Render ────────────────────────────────────────────────────────────────────
 
 class RenderRequest(BaseModel):
-    design_id: str
+    design_id: UUID
 
 
 class RenderJobResponse(BaseSchema):
-    job_id: str
-    design_id: str
+    job_id: UUID
+    design_id: UUID
     status: str                  # pending | processing | done | failed
     image_url: str | None = None
     error: str | None = None
@@ -99,7 +100,7 @@ class ARPosition(BaseModel):
 
 
 class ARSessionResponse(BaseModel):
-    design_id: str
+    design_id: UUID
     model_url: str
     positions: list[ARPosition]
     scale_factor: float = 1.0
@@ -109,7 +110,7 @@ class ARSessionResponse(BaseModel):
 # ── Agent / Procurement ───────────────────────────────────────────────────────
 
 class ProcureRequest(BaseModel):
-    design_id: str
+    design_id: UUID
     budget_usd: float | None = None
     preferred_vendors: list[str] = Field(default_factory=list)
 
@@ -2,8 +2,6 @@
 
 from __future__ import annotations
 
-import json
-
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,10 +9,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.db_models import Design
 from app.models.schemas import ProcureRequest
-from app.services.ai_provider import BaseAIProvider, get_ai_provider
+from app.services.ai_provider import BaseAIProvider, get_ai_provider, sse_frame
 
 router = APIRouter(prefix="/api/agent", tags=["agent"])
 
+# Terminal SSE frame — identical for every stream, so built once.
+_DONE = b'data: {"event":"done","data":null}\n\n'
+
 
 @router.post("/procure", summary="Stream procurement agent events via SSE")
 async def procure(
@@ -26,23 +27,21 @@ async def procure(
     if design is None:
         raise HTTPException(status_code=404, detail="Design not found")
 
-    design_data = json.loads(design.design_json or "{}")
+    design_data = design.design_json or {}
 
     async def _event_stream():
         try:
-            async for event in ai.procure(
+            # Providers yield finished SSE frames — pass them straight through.
+            async for frame in ai.procure(
                 design=design_data,
                 budget=body.budget_usd,
                 vendors=body.preferred_vendors,
             ):
-                # SSE format: "data: <json>\n\n"
-                payload = json.dumps({"event": event["event"], "data": event["data"]})
-                yield f"data: {payload}\n\n"
+                yield frame
         except Exception as exc:
-            error_payload = json.dumps({"event": "error", "data": str(exc)})
-            yield f"data: {error_payload}\n\n"
+            yield sse_frame("error", str(exc))
         finally:
-            yield "data: {\"event\": \"done\", \"data\": null}\n\n"
+            yield _DONE
 
     return StreamingResponse(
         _event_stream(),
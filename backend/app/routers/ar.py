@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-import json
+import uuid
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -22,14 +22,14 @@ _DEFAULT_MODEL_PATH = "/static/models/room_default.glb"
 
 @router.get("/session/{design_id}", response_model=ARSessionResponse, summary="Get AR session data for a design")
 async def get_ar_session(
-    design_id: str,
+    design_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
 ) -> ARSessionResponse:
     design: Design | None = await db.get(Design, design_id)
     if design is None:
         raise HTTPException(status_code=404, detail="Design not found")
 
-    design_data = json.loads(design.design_json or "{}")
+    design_data = design.design_json or {}
     furniture = design_data.get("furniture", [])
 
     # Build AR positions from stored furniture layout
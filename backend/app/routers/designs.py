@@ -8,7 +8,6 @@ GET  /api/designs/render/{job_id}
 
 from __future__ import annotations
 
-import json
 import uuid
 from datetime import datetime, timezone
 
@@ -47,7 +46,7 @@ async def generate_design(
         raise HTTPException(status_code=404, detail="Room not found")
 
     room: Room = result
-    analysis = json.loads(room.analysis_json or "{}")
+    analysis = room.analysis_json or {}
 
     # Generate design via AI
     design_raw = await ai.generate_design(analysis, body.style, body.preferences)
@@ -56,11 +55,10 @@ async def generate_design(
     design = Design(
         room_id=room.id,
         style=body.style,
-        design_json=json.dumps(design_raw),
+        design_json=design_raw,
     )
     db.add(design)
     await db.commit()
-    await db.refresh(design)
 
     furniture = [FurniturePiece(**f) for f in design_raw["furniture"]]
 
@@ -90,25 +88,25 @@ async def submit_render(
     if design is None:
         raise HTTPException(status_code=404, detail="Design not found")
 
-    design_data = json.loads(design.design_json or "{}")
+    design_data = design.design_json or {}
 
     # Generate a shared job_id so DB record and queue entry stay in sync
-    job_id = str(uuid.uuid4())
+    job_id = uuid.uuid4()
 
-    # Persist job record with stable ID
+    # Persist job record with stable ID — committed once, after enqueueing
     job_record = RenderJob(id=job_id, design_id=design.id, status="pending")
     db.add(job_record)
-    await db.commit()
 
     # Submit to async queue using the same job_id
     queued = await queue.submit(
-        design_id=design.id,
+        design_id=str(design.id),
         design_data=design_data,
         ai_provider=ai,
         renders_dir=settings.renders_dir,
         backend_public_url=settings.backend_public_url,
-        job_id=job_id,
+        job_id=str(job_id),
     )
+    await db.commit()
 
     return RenderJobResponse(
         job_id=queued.job_id,
@@ -124,10 +122,10 @@ async def submit_render(
 
 @router.get("/render/{job_id}", response_model=RenderJobResponse, summary="Poll render job status")
 async def get_render_status(
-    job_id: str,
+    job_id: uuid.UUID,
     queue: RenderQueue = Depends(get_render_queue),
 ) -> RenderJobResponse:
-    job = queue.get_job(job_id)
+    job = queue.get_job(str(job_id))
     if job is None:
         raise HTTPException(status_code=404, detail="Render job not found")
 
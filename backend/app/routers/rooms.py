@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
-import json
-import os
+import uuid
+from pathlib import PurePosixPath
 
+import aiofiles
+import aiofiles.os
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -17,7 +19,20 @@ from app.services.ai_provider import BaseAIProvider, get_ai_provider
 router = APIRouter(prefix="/api/rooms", tags=["rooms"])
 settings = get_settings()
 
-_ALLOWED_TYPES = {"image/jpeg", "image/png", "image/webp", "image/heic"}
+_ALLOWED_TYPES = frozenset({"image/jpeg", "image/png", "image/webp", "image/heic"})
+_HEIC_BRANDS = (b"heic", b"heix", b"hevc", b"hevx", b"mif1", b"msf1")
+_CHUNK_SIZE = 64 * 1024
+_UPLOADS_DIR = settings.uploads_dir
+
+
+def _looks_like_image(head: bytes) -> bool:
+    """Match the file's magic bytes — the client-sent content type is not trusted."""
+    return (
+        head.startswith(b"\xff\xd8\xff")                            # JPEG
+        or head.startswith(b"\x89PNG\r\n\x1a\n")                     # PNG
+        or (head.startswith(b"RIFF") and head[8:12] == b"WEBP")     # WEBP
+        or (head[4:8] == b"ftyp" and head[8:12] in _HEIC_BRANDS)    # HEIC
+    )
 
 
 @router.post("/analyze", response_model=RoomAnalyzeResponse, summary="Upload and analyse a room image")
@@ -30,17 +45,45 @@ async def analyze_room(
     if file.content_type not in _ALLOWED_TYPES:
         raise HTTPException(status_code=415, detail=f"Unsupported file type: {file.content_type}")
 
-    image_bytes = await file.read()
-    if len(image_bytes) > settings.upload_max_mb * 1024 * 1024:
-        raise HTTPException(status_code=413, detail=f"File exceeds {settings.upload_max_mb} MB limit")
+    head = await file.read(16)
+    await file.seek(0)
+    if not _looks_like_image(head):
+        raise HTTPException(status_code=415, detail="File content is not a supported image")
 
     # ── Save upload ───────────────────────────────────────────────────────────
-    os.makedirs(settings.uploads_dir, exist_ok=True)
-    safe_name = os.path.basename(file.filename or "upload.jpg")
-    upload_path = os.path.join(settings.uploads_dir, safe_name)
-    with open(upload_path, "wb") as f:
-        f.write(image_bytes)
+    # Stream in chunks so oversized uploads are rejected as soon as they cross
+    # the limit. The chunks are kept for the AI provider (joined once), but disk
+    # writes go to a unique .part file that only replaces the final path once
+    # the size check passes — a rejected upload never clobbers an existing one.
+    # Normalise Windows-style separators too, so no client path component survives.
+    safe_name = PurePosixPath((file.filename or "").replace("\\", "/")).name
+    if safe_name in ("", ".", ".."):
+        safe_name = "upload.jpg"
+    upload_path = f"{_UPLOADS_DIR}/{safe_name}"
+    part_path = f"{upload_path}.{uuid.uuid4().hex}.part"
+    chunks: list[bytes] = []
+    size = 0
+    try:
+        async with aiofiles.open(part_path, "wb") as out:
+            while chunk := await file.read(_CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.upload_max_bytes:
+                    break
+                chunks.append(chunk)
+                await out.write(chunk)
+
+        if size > settings.upload_max_bytes:
+            raise HTTPException(status_code=413, detail=f"File exceeds {settings.upload_max_mb} MB limit")
+        await aiofiles.os.replace(part_path, upload_path)
+    except BaseException:
+        if await aiofiles.os.path.exists(part_path):
+            await aiofiles.os.remove(part_path)
+        raise
+
     file_url = f"{settings.backend_public_url}/static/uploads/{safe_name}"
+    # One contiguous copy for the provider; drop the chunk list so only it stays alive.
+    image_bytes = b"".join(chunks)
+    del chunks
 
     # ── AI analysis ───────────────────────────────────────────────────────────
     analysis_raw = await ai.analyze_room(image_bytes, file.filename or "upload")
@@ -49,11 +92,10 @@ async def analyze_room(
     room = Room(
         filename=safe_name,
         file_url=file_url,
-        analysis_json=json.dumps(analysis_raw),
+        analysis_json=analysis_raw,
     )
     db.add(room)
     await db.commit()
-    await db.refresh(room)
 
     analysis = RoomAnalysis(**analysis_raw)
     return RoomAnalyzeResponse(
@@ -9,14 +9,40 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import binascii
+import hashlib
 import io
 import logging
+import math
+import os
 import random
+import threading
 import uuid
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import aiofiles
+import httpx
+import orjson
+from fastapi import Request
 
 from app.config import get_settings
 
+try:
+    from PIL import Image, ImageDraw, features
+except ImportError:  # Pillow is optional — FakeProvider falls back to a 1×1 PNG
+    Image = ImageDraw = features = None
+
+# Pillow builds without libwebp still render, just as PNG.
+_WEBP = features is not None and features.check("webp")
+
+try:
+    from groq import AsyncGroq
+except ImportError:  # only required when AI_PROVIDER=groq — checked in GroqProvider
+    AsyncGroq = None
+
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
@@ -26,6 +52,17 @@ settings = get_settings()
 class BaseAIProvider(ABC):
     """Contract every AI provider must satisfy."""
 
+    # Encoding of render_design() output — the render queue names files after it.
+    render_ext: str = ".png"
+    render_mime: str = "image/png"
+    # >1 → the render queue groups concurrent jobs into render_design_batch()
+    # calls of up to this many designs (worth it for batched GPU inference).
+    render_batch_size: int = 1
+
+    def __init__(self, http_client: httpx.AsyncClient | None = None) -> None:
+        # Shared app-wide client (see main.lifespan); None → provider's own default.
+        self._http = http_client
+
     @abstractmethod
     async def analyze_room(self, image_bytes: bytes, filename: str) -> dict:
         """Return structured room analysis dict."""
@@ -38,119 +75,289 @@ class BaseAIProvider(ABC):
 
     @abstractmethod
     async def render_design(self, design: dict) -> bytes:
-        """Return raw PNG bytes of the rendered design."""
+        """Return encoded image bytes of the rendered design (see render_mime)."""
         ...
 
+    async def aclose(self) -> None:
+        """Release provider-owned resources. The shared HTTP client belongs to the lifespan."""
+
+    async def render_design_to(self, design: dict, path: str) -> None:
+        """Render the design into ``path``. Default: render_design() + async write."""
+        image_bytes = await self.render_design(design)
+        async with aiofiles.open(path, "wb") as f:
+            await f.write(image_bytes)
+
+    async def render_design_batch(self, designs: list[dict]) -> list[bytes]:
+        """
+        Render several designs, results in input order. Default: concurrent
+        single renders — override with one batched call where the backend supports it.
+        # TODO: PRODUCTION — one SDXL forward pass per batch
+        """
+        return list(await asyncio.gather(*(self.render_design(d) for d in designs)))
+
     @abstractmethod
     async def procure(self, design: dict, budget: float | None, vendors: list[str]):
-        """Async generator yielding procurement SSE events."""
+        """Async generator yielding procurement events as ready-to-send SSE frames (bytes)."""
         ...
 
 
+def sse_frame(event: str, data) -> bytes:
+    """Serialise one agent event as an SSE frame: ``data: {"event": ..., "data": ...}``."""
+    return b"data: " + orjson.dumps({"event": event, "data": data}) + b"\n\n"
+
+
+def _furniture_total(furniture: list[dict]) -> float:
+    """Sum piece prices (missing/None → 0); fsum keeps cents exact before rounding."""
+    return math.fsum([p.get("price_usd") or 0 for p in furniture])
+
+
 # ── Fake Provider (default / demo) ────────────────────────────────────────────
 
+# Static design tables — built once at import, not per generate_design call.
+_PALETTES: dict[str, tuple[str, ...]] = {
+    "modern": ("#FFFFFF", "#2C3E50", "#BDC3C7", "#E74C3C"),
+    "scandinavian": ("#F5F5F0", "#8B7355", "#D4C5A9", "#4A4A4A"),
+    "industrial": ("#3D3D3D", "#B87333", "#8B8680", "#F5F5DC"),
+    "bohemian": ("#C19A6B", "#8B4513", "#DEB887", "#6B8E23"),
+    "minimalist": ("#FAFAFA", "#E0E0E0", "#9E9E9E", "#212121"),
+    "traditional": ("#8B4513", "#D2691E", "#F4A460", "#FFFAF0"),
+}
+_DEFAULT_PALETTE: tuple[str, ...] = ("#FFFFFF", "#000000", "#888888", "#CCCCCC")
+# SKU style segment, e.g. "scandinavian" → "SCA".
+_STYLE_PREFIX: dict[str, str] = {s: s[:3].upper() for s in _PALETTES}
+
+# Room-independent fields per piece; positions depend on room size and are
+# computed per call. Order matches palette index and SKU sequence number.
+_FURNITURE_TEMPLATE: tuple[dict, ...] = (
+    {"name": "Sofa", "category": "seating", "rotation": 0.0,
+     "dimensions": {"w": 2.2, "h": 0.85, "d": 0.95}, "price_usd": 899.00, "vendor": "FurnitureCo", "sku": "SF"},
+    {"name": "Coffee Table", "category": "table", "rotation": 0.0,
+     "dimensions": {"w": 1.2, "h": 0.45, "d": 0.6}, "price_usd": 299.00, "vendor": "FurnitureCo", "sku": "CT"},
+    {"name": "Floor Lamp", "category": "lighting", "rotation": 0.0,
+     "dimensions": {"w": 0.35, "h": 1.8, "d": 0.35}, "price_usd": 149.00, "vendor": "LightHouse", "sku": "FL"},
+    {"name": "Bookshelf", "category": "storage", "rotation": 90.0,
+     "dimensions": {"w": 1.0, "h": 2.0, "d": 0.3}, "price_usd": 399.00, "vendor": "WoodWorks", "sku": "BS"},
+)
+_FURNITURE_TOTAL_USD = round(sum(t["price_usd"] for t in _FURNITURE_TEMPLATE), 2)
+
+# 1×1 white PNG (89 bytes, hardcoded) — render fallback when Pillow is missing.
+_FALLBACK_PNG: bytes = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8"
+    "z8BQDwADhQGAWjR9awAAAABJRU5ErkJggg=="
+)
+
+
+_render_tls = threading.local()
+_RENDER_DEFAULT_PALETTE: tuple[str, ...] = ("#FFFFFF", "#000000")
+# Render encodes get their own pool (one worker per core, max 8) so concurrent
+# renders spread over the cores without crowding the loop's default executor,
+# which aiofiles and to_thread callers share.
+_render_executor: ThreadPoolExecutor | None = None
+
+
+async def _run_render(*args):
+    """Run _render_sync on the dedicated render pool, creating it on first use."""
+    global _render_executor
+    if _render_executor is None:
+        _render_executor = ThreadPoolExecutor(
+            max_workers=min(8, os.cpu_count() or 1),
+            thread_name_prefix="spaceforge-render",
+        )
+    return await asyncio.get_running_loop().run_in_executor(_render_executor, _render_sync, *args)
+
+
+def _render_inputs(design: dict) -> tuple:
+    """
+    Everything the placeholder depends on, normalised once: (style, palette,
+    labels of the first six pieces). It is both the render cache key and
+    _render_sync's input, so the two can't disagree about defaults.
+    """
+    palette = design.get("color_palette", _RENDER_DEFAULT_PALETTE)
+    labels = tuple(
+        name[:10] if isinstance(name, str) else None
+        for name in (
+            piece.get("name") if isinstance(piece, dict) else None
+            for piece in islice(design.get("furniture") or (), 6)
+        )
+    )
+    return design.get("style", "modern"), tuple(palette or ()), labels
+
+
+def _render_sync(inputs: tuple, path: str | None = None) -> bytes:
+    """
+    Draw the placeholder render and encode it as WebP (PNG without libwebp),
+    also writing it to ``path`` when given. Blocking — run in a thread.
+    Draws in palette ("P") mode, which keeps the canvas at 1 byte/pixel while
+    drawing; the WebP encoder converts it back to RGB, so only the PNG
+    fallback encodes the smaller palette data.
+    """
+    style, palette, labels = inputs
+
+    img = Image.new("P", (1024, 768), color=palette[0] if palette else "#F0F0F0")
+    draw = ImageDraw.Draw(img)
+
+    # Draw furniture silhouettes
+    for i, label in enumerate(labels):
+        hue = palette[i % len(palette)] if palette else "#888888"
+        x0 = 100 + i * 140
+        y0 = 300
+        x1 = x0 + 120
+        y1 = y0 + 80
+        try:
+            draw.rectangle([x0, y0, x1, y1], fill=hue, outline="#333333", width=2)
+            if label is not None:
+                draw.text((x0 + 5, y0 + 30), label, fill="#333333")
+        except Exception:
+            pass
+
+    draw.text((20, 20), f"SpaceForge · {style.capitalize()} Design", fill="#333333")
+    draw.text((20, 50), "Rendered by FakeProvider  ·  # TODO: PRODUCTION (SDXL)", fill="#999999")
+
+    # Reuse this worker thread's buffer so repeat renders don't regrow a fresh one.
+    buf = getattr(_render_tls, "buf", None)
+    if buf is None:
+        buf = _render_tls.buf = io.BytesIO()
+    buf.seek(0)
+    buf.truncate(0)
+    if _WEBP:
+        # Lossy q80 is several times smaller than PNG and cheaper to encode.
+        img.save(buf, format="WEBP", quality=80, method=4)
+    else:
+        img.save(buf, format="PNG", optimize=False, compress_level=1)
+    if path is not None:
+        with open(path, "wb") as f, buf.getbuffer() as view:
+            f.write(view)
+    return buf.getvalue()
+
+
+# Fake results are pure functions of their inputs, so repeat calls (same photo,
+# same room + style) are served from a bounded LRU and skip the simulated latency.
+# Values are stored as orjson bytes so every hit hands out a fresh, mutable dict.
+_FAKE_CACHE_SIZE = 256
+# Max in-flight vendor searches per provider, shared by all procurement streams.
+_MAX_VENDOR_SEARCHES = 8
+_analysis_cache: OrderedDict[int, bytes] = OrderedDict()
+_design_cache: OrderedDict[tuple, bytes] = OrderedDict()
+# Encoded renders are ~tens of KB each, so keep fewer of them.
+_RENDER_CACHE_SIZE = 64
+_RENDER_CACHE: OrderedDict[tuple, bytes] = OrderedDict()
+
+
+def _cache_get(cache: OrderedDict, key) -> bytes | None:
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _cache_put(cache: OrderedDict, key, value: bytes, maxsize: int = _FAKE_CACHE_SIZE) -> None:
+    cache[key] = value
+    if len(cache) > maxsize:
+        cache.popitem(last=False)
+
+
 class FakeProvider(BaseAIProvider):
     """
     Deterministic fake provider for local development and demos.
     Simulates realistic latency without any API keys.
     """
 
-    _ROOM_TYPES = ["living_room", "bedroom", "dining_room", "home_office", "kitchen"]
-    _LIGHTING = ["natural", "artificial", "mixed"]
-    _FEATURES = ["window", "door", "hardwood_floor", "carpet", "fireplace", "closet", "built-in shelves"]
-    _STYLES = ["modern", "scandinavian", "industrial", "bohemian", "minimalist", "traditional"]
+    _ROOM_TYPES: tuple[str, ...] = ("living_room", "bedroom", "dining_room", "home_office", "kitchen")
+    _LIGHTING: tuple[str, ...] = ("natural", "artificial", "mixed")
+    _FEATURES: tuple[str, ...] = (
+        "window", "door", "hardwood_floor", "carpet", "fireplace", "closet", "built-in shelves",
+    )
+    _STYLES: tuple[str, ...] = ("modern", "scandinavian", "industrial", "bohemian", "minimalist", "traditional")
+
+    render_ext, render_mime = (".webp", "image/webp") if _WEBP else (".png", "image/png")
+
+    def __init__(self, http_client: httpx.AsyncClient | None = None) -> None:
+        super().__init__(http_client)
+        self._delay = settings.fake_latency_ms / 1000
+        self._vendor_limit = asyncio.Semaphore(_MAX_VENDOR_SEARCHES)  # stay under vendor rate limits
+
+    async def _simulate_latency(self) -> None:
+        """Demo pacing — a no-op unless FAKE_LATENCY_MS is set."""
+        if self._delay:
+            await asyncio.sleep(self._delay)
 
     async def analyze_room(self, image_bytes: bytes, filename: str) -> dict:
-        await asyncio.sleep(1.2)  # simulate model inference
-        rng = random.Random(len(image_bytes))
+        # Content hash → seed: identical photos always get the same analysis and
+        # different ones don't collide the way length-based seeds did.
+        seed = int.from_bytes(hashlib.blake2b(image_bytes, digest_size=8).digest(), "little")
+        # The seed fully determines the result — it is the cache key.
+        cached = _cache_get(_analysis_cache, seed)
+        if cached is not None:
+            return orjson.loads(cached)
+
+        await self._simulate_latency()  # model inference
+        analysis = self._analysis_for_seed(seed)
+        _cache_put(_analysis_cache, seed, orjson.dumps(analysis))
+        return analysis
+
+    def _analysis_for_seed(self, seed: int) -> dict:
+        rng = random.Random(seed)
+        # int(x * 10) / 10 truncates to one decimal without a round() call.
         return {
             "room_type": rng.choice(self._ROOM_TYPES),
             "dimensions": {
-                "width": round(rng.uniform(3.0, 6.0), 1),
-                "height": round(rng.uniform(2.4, 3.5), 1),
-                "depth": round(rng.uniform(4.0, 8.0), 1),
+                "width": int(rng.uniform(3.0, 6.0) * 10) / 10,
+                "height": int(rng.uniform(2.4, 3.5) * 10) / 10,
+                "depth": int(rng.uniform(4.0, 8.0) * 10) / 10,
             },
             "lighting": rng.choice(self._LIGHTING),
             "existing_features": rng.sample(self._FEATURES, k=rng.randint(2, 4)),
             "style_hints": rng.sample(self._STYLES, k=2),
-            "confidence": round(rng.uniform(0.82, 0.99), 2),
+            "confidence": int(rng.uniform(0.82, 0.99) * 100) / 100,
         }
 
     async def generate_design(self, analysis: dict, style: str, preferences: dict) -> dict:
-        await asyncio.sleep(1.5)
-        colors = {
-            "modern": ["#FFFFFF", "#2C3E50", "#BDC3C7", "#E74C3C"],
-            "scandinavian": ["#F5F5F0", "#8B7355", "#D4C5A9", "#4A4A4A"],
-            "industrial": ["#3D3D3D", "#B87333", "#8B8680", "#F5F5DC"],
-            "bohemian": ["#C19A6B", "#8B4513", "#DEB887", "#6B8E23"],
-            "minimalist": ["#FAFAFA", "#E0E0E0", "#9E9E9E", "#212121"],
-            "traditional": ["#8B4513", "#D2691E", "#F4A460", "#FFFAF0"],
-        }.get(style, ["#FFFFFF", "#000000", "#888888", "#CCCCCC"])
+        dims = analysis["dimensions"]
+        # Preferences aren't used by the fake layout, so they're not part of the key.
+        key = (style, analysis["room_type"], dims["width"], dims["depth"])
+        cached = _cache_get(_design_cache, key)
+        if cached is not None:
+            design = orjson.loads(cached)
+            for piece in design["furniture"]:
+                piece["id"] = uuid.uuid4().hex  # every design gets its own piece ids
+            return design
+
+        await self._simulate_latency()
+        design = self._design_for(analysis, style)
+        _cache_put(_design_cache, key, orjson.dumps(design))
+        return design
+
+    def _design_for(self, analysis: dict, style: str) -> dict:
+        colors = _PALETTES.get(style, _DEFAULT_PALETTE)
+        sku_style = _STYLE_PREFIX.get(style) or style[:3].upper()
 
         w = analysis["dimensions"]["width"]
         d = analysis["dimensions"]["depth"]
+        positions = (
+            {"x": 0.0, "y": 0.0, "z": 1.0},
+            {"x": 0.0, "y": 0.0, "z": 2.5},
+            {"x": w / 2 - 0.5, "y": 0.0, "z": 0.8},
+            {"x": -(w / 2 - 0.2), "y": 0.0, "z": d / 2 - 0.2},
+        )
 
         furniture = [
             {
-                "id": str(uuid.uuid4()),
-                "name": "Sofa",
-                "category": "seating",
+                "id": uuid.uuid4().hex,
+                "name": t["name"],
+                "category": t["category"],
                 "style": style,
-                "color": colors[0],
-                "position": {"x": 0.0, "y": 0.0, "z": 1.0},
-                "rotation": 0.0,
-                "dimensions": {"w": 2.2, "h": 0.85, "d": 0.95},
+                "color": colors[i],
+                "position": position,
+                "rotation": t["rotation"],
+                "dimensions": dict(t["dimensions"]),
                 "model_url": None,
-                "price_usd": 899.00,
-                "vendor": "FurnitureCo",
-                "sku": f"SF-{style[:3].upper()}-001",
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Coffee Table",
-                "category": "table",
-                "style": style,
-                "color": colors[1],
-                "position": {"x": 0.0, "y": 0.0, "z": 2.5},
-                "rotation": 0.0,
-                "dimensions": {"w": 1.2, "h": 0.45, "d": 0.6},
-                "model_url": None,
-                "price_usd": 299.00,
-                "vendor": "FurnitureCo",
-                "sku": f"CT-{style[:3].upper()}-002",
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Floor Lamp",
-                "category": "lighting",
-                "style": style,
-                "color": colors[2],
-                "position": {"x": w / 2 - 0.5, "y": 0.0, "z": 0.8},
-                "rotation": 0.0,
-                "dimensions": {"w": 0.35, "h": 1.8, "d": 0.35},
-                "model_url": None,
-                "price_usd": 149.00,
-                "vendor": "LightHouse",
-                "sku": f"FL-{style[:3].upper()}-003",
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Bookshelf",
-                "category": "storage",
-                "style": style,
-                "color": colors[3],
-                "position": {"x": -(w / 2 - 0.2), "y": 0.0, "z": d / 2 - 0.2},
-                "rotation": 90.0,
-                "dimensions": {"w": 1.0, "h": 2.0, "d": 0.3},
-                "model_url": None,
-                "price_usd": 399.00,
-                "vendor": "WoodWorks",
-                "sku": f"BS-{style[:3].upper()}-004",
-            },
+                "price_usd": t["price_usd"],
+                "vendor": t["vendor"],
+                "sku": f"{t['sku']}-{sku_style}-{i + 1:03d}",
+            }
+            for i, (t, position) in enumerate(zip(_FURNITURE_TEMPLATE, positions))
         ]
 
-        total = sum(f["price_usd"] for f in furniture)
-
         return {
             "style": style,
             "furniture": furniture,
@@ -160,92 +367,102 @@ class FakeProvider(BaseAIProvider):
                 f"Sofa faces the focal wall with coffee table centred. "
                 f"Floor lamp provides ambient lighting near seating area."
             ),
-            "color_palette": colors,
-            "estimated_cost_usd": round(total, 2),
+            "color_palette": list(colors),
+            "estimated_cost_usd": _FURNITURE_TOTAL_USD,
         }
 
     async def render_design(self, design: dict) -> bytes:
         """
         Simulate SDXL rendering.
-        Returns a procedurally generated PNG placeholder.
+        Returns a procedurally generated WebP (or PNG) placeholder.
         # TODO: PRODUCTION — replace with Replicate / Modal SDXL call
         """
-        await asyncio.sleep(3.0)  # simulate GPU render time
+        key = _render_inputs(design)
+        cached = _cache_get(_RENDER_CACHE, key)
+        if cached is not None:
+            return cached
 
-        try:
-            from PIL import Image, ImageDraw, ImageFont
-        except ImportError:
-            # Pillow not available — return a minimal 1×1 PNG
-            # 1×1 white PNG (89 bytes, hardcoded)
-            return base64.b64decode(
-                "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8"
-                "z8BQDwADhQGAWjR9awAAAABJRU5ErkJggg=="
-            )
+        await self._simulate_latency()  # GPU render time
 
-        style = design.get("style", "modern")
-        palette = design.get("color_palette", ["#FFFFFF", "#000000"])
-
-        img = Image.new("RGB", (1024, 768), color=palette[0] if palette else "#F0F0F0")
-        draw = ImageDraw.Draw(img)
-
-        # Draw furniture silhouettes
-        for i, piece in enumerate(design.get("furniture", [])[:6]):
-            hue = palette[i % len(palette)] if palette else "#888888"
-            x0 = 100 + i * 140
-            y0 = 300
-            x1 = x0 + 120
-            y1 = y0 + 80
-            try:
-                draw.rectangle([x0, y0, x1, y1], fill=hue, outline="#333333", width=2)
-                draw.text((x0 + 5, y0 + 30), piece["name"][:10], fill="#333333")
-            except Exception:
-                pass
-
-        draw.text((20, 20), f"SpaceForge · {style.capitalize()} Design", fill="#333333")
-        draw.text((20, 50), "Rendered by FakeProvider  ·  # TODO: PRODUCTION (SDXL)", fill="#999999")
+        if Image is None:
+            # Pillow not available — return a minimal 1×1 PNG
+            return _FALLBACK_PNG
+
+        # Drawing + zlib encode are CPU-bound — keep them off the event loop.
+        png = await _run_render(key)
+        _cache_put(_RENDER_CACHE, key, png, _RENDER_CACHE_SIZE)
+        return png
+
+    async def render_design_to(self, design: dict, path: str) -> None:
+        """Cache miss: encode and write in one worker-thread hop."""
+        key = _render_inputs(design)
+        if Image is None or _cache_get(_RENDER_CACHE, key) is not None:
+            await super().render_design_to(design, path)
+            return
+
+        await self._simulate_latency()  # GPU render time
+        data = await _run_render(key, path)
+        _cache_put(_RENDER_CACHE, key, data, _RENDER_CACHE_SIZE)
+
+    async def _search(self, piece: dict) -> dict:
+        """Simulated vendor lookup for one furniture piece."""
+        async with self._vendor_limit:
+            await self._simulate_latency()
+        return self._search_result(piece)
+
+    @staticmethod
+    def _search_result(piece: dict) -> dict:
+        return {
+            "furniture_id": piece["id"],
+            "name": piece["name"],
+            "sku": piece.get("sku"),
+            "price_usd": piece.get("price_usd"),
+            "in_stock": True,
+            "buy_url": f"https://example.com/buy/{piece.get('sku', 'unknown')}",
+        }
 
-        buf = io.BytesIO()
-        img.save(buf, format="PNG")
-        return buf.getvalue()
+    async def _search_concurrently(self, furniture: list[dict]):
+        """
+        Vendor searches are independent — run them concurrently and yield each
+        result as it lands, as a real agent would fan out API calls.
+        """
+        tasks = [asyncio.create_task(self._search(piece)) for piece in furniture]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield sse_frame("result", await next_result)
+        finally:
+            for task in tasks:
+                task.cancel()
 
     async def procure(self, design: dict, budget: float | None, vendors: list[str]):
         """
         Simulate an agentic procurement loop.
-        Yields SSE-compatible dicts.
+        Yields pre-serialised SSE frames.
         # TODO: PRODUCTION — replace with LangGraph / AutoGen agent
         """
         furniture = design.get("furniture", [])
         currency = "USD"
 
-        yield {"event": "thought", "data": f"Analysing {len(furniture)} furniture pieces against budget ${budget or '∞'} {currency}"}
-        await asyncio.sleep(0.4)
+        yield sse_frame("thought", f"Analysing {len(furniture)} furniture pieces against budget ${budget or '∞'} {currency}")
 
         for piece in furniture:
-            yield {"event": "action", "data": f"Searching '{piece['name']}' at {piece.get('vendor', 'any vendor')}"}
-            await asyncio.sleep(0.3)
-            yield {
-                "event": "result",
-                "data": {
-                    "furniture_id": piece["id"],
-                    "name": piece["name"],
-                    "sku": piece.get("sku"),
-                    "price_usd": piece.get("price_usd"),
-                    "in_stock": True,
-                    "buy_url": f"https://example.com/buy/{piece.get('sku', 'unknown')}",
-                },
-            }
-            await asyncio.sleep(0.2)
+            yield sse_frame("action", f"Searching '{piece['name']}' at {piece.get('vendor', 'any vendor')}")
+
+        if not self._delay:
+            # No simulated latency — skip the task/timer machinery entirely.
+            for piece in furniture:
+                yield sse_frame("result", self._search_result(piece))
+        else:
+            async for event in self._search_concurrently(furniture):
+                yield event
 
-        total = sum(p.get("price_usd", 0) for p in furniture)
+        total = _furniture_total(furniture)
         within_budget = budget is None or total <= budget
-        yield {
-            "event": "summary",
-            "data": {
-                "total_usd": round(total, 2),
-                "within_budget": within_budget,
-                "items": len(furniture),
-            },
-        }
+        yield sse_frame("summary", {
+            "total_usd": round(total, 2),
+            "within_budget": within_budget,
+            "items": len(furniture),
+        })
 
 
 # ── Groq Provider ─────────────────────────────────────────────────────────────
@@ -253,53 +470,157 @@ class FakeProvider(BaseAIProvider):
 # Vision:  llama-3.2-90b-vision-preview  (room analysis)
 # Text:    llama-3.3-70b-versatile       (design gen, procurement)
 
+# Streaming procurement: batch token deltas into one "thought" event per flush.
+_FLUSH_CHARS = 256
+_FLUSH_MS = 80
+
+# Vision upload MIME by file extension; anything else is sent as JPEG.
+_MIME_BY_EXT: dict[str, str] = {".png": "image/png", ".webp": "image/webp"}
+# Uploads above this size are base64-encoded in a worker thread.
+_INLINE_B64_MAX = 64 * 1024
+
+
+def _extract_json(raw: str) -> dict:
+    """
+    Parse a JSON object from a model reply, even if wrapped in markdown/prose.
+    Clean JSON parses directly; otherwise one linear scan finds the first
+    balanced {...} (braces inside strings are ignored). Any other top-level
+    JSON value (array, string, number) raises ValueError.
+    """
+    try:
+        parsed = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        pass
+    else:
+        if not isinstance(parsed, dict):
+            raise ValueError(f"expected a JSON object, got {type(parsed).__name__}")
+        return parsed
+
+    start = raw.find("{")
+    if start != -1:
+        depth = 0
+        in_string = escaped = False
+        for i in range(start, len(raw)):
+            ch = raw[i]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0:
+                    return orjson.loads(raw[start:i + 1])
+    return orjson.loads(raw)  # no object found — surface the decode error
+
+
+def _b64_ascii(data: bytes) -> str:
+    # b2a_base64 encodes straight from the buffer in one pass; ASCII decode is a cheap copy.
+    return binascii.b2a_base64(data, newline=False).decode("ascii")
+
+
+# Constant prompt text — shared strings, not rebuilt per call.
+_ANALYZE_SYSTEM = (
+    "You are an expert interior designer AI. "
+    "Respond ONLY with a valid JSON object — no markdown, no explanation."
+)
+_ANALYZE_PROMPT = (
+    "Analyze this room photograph and return JSON with this exact schema:\n"
+    '{"room_type":string,"dimensions":{"width":number,"height":number,"depth":number},'
+    '"lighting":string,"existing_features":[string],"style_hints":[string],"confidence":number}\n'
+    "All measurements in metres. confidence is 0.0–1.0."
+)
+_DESIGN_SCHEMA = (
+    "Return ONLY valid JSON with this exact schema:\n"
+    '{"style":string,"furniture":[{"id":string,"name":string,"category":string,'
+    '"style":string,"color":string,"position":{"x":number,"y":number,"z":number},'
+    '"rotation":number,"dimensions":{"w":number,"h":number,"d":number},'
+    '"model_url":null,"price_usd":number,"vendor":string,"sku":string}],'
+    '"layout_notes":string,"color_palette":[string],"estimated_cost_usd":number}\n'
+    "Include 4–6 furniture items. Dimensions in metres."
+)
+_PROCURE_INSTRUCTIONS = (
+    "For each item: find the best real purchase source, suggest budget alternatives, "
+    "give realistic price. End with total cost and savings summary."
+)
+
+
+# Process-wide AsyncGroq clients keyed on (hash of API key, HTTP client), so
+# rebuilt providers reuse warm connections and the secret is never a cache key.
+_groq_clients: dict[tuple[str, httpx.AsyncClient | None], AsyncGroq] = {}
+# HTTP pools created here rather than by the lifespan — closed on shutdown.
+_owned_http_clients: list[httpx.AsyncClient] = []
+
+
+def _groq_client(api_key: str, http_client: httpx.AsyncClient | None) -> AsyncGroq:
+    key = (hashlib.blake2b(api_key.encode(), digest_size=16).hexdigest(), http_client)
+    client = _groq_clients.get(key)
+    if client is None:
+        if http_client is None:
+            # Outside the app lifespan (scripts, workers) there's no shared
+            # client, so give the SDK a pooled HTTP/2 one of our own.
+            http_client = httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(60.0, connect=5.0),
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            )
+            _owned_http_clients.append(http_client)
+        client = _groq_clients[key] = AsyncGroq(api_key=api_key, http_client=http_client)
+    return client
+
+
+async def _close_groq_clients() -> None:
+    """Forget cached SDK clients and close the HTTP pools this module created."""
+    _groq_clients.clear()
+    while _owned_http_clients:
+        await _owned_http_clients.pop().aclose()
+
+
 class GroqProvider(BaseAIProvider):
-    def __init__(self) -> None:
-        try:
-            from groq import AsyncGroq
-        except ImportError as exc:
+    # Renders are delegated to FakeProvider, so its encoding applies.
+    render_ext, render_mime = FakeProvider.render_ext, FakeProvider.render_mime
+
+    def __init__(self, http_client: httpx.AsyncClient | None = None) -> None:
+        super().__init__(http_client)
+        if AsyncGroq is None:
             raise RuntimeError(
                 "groq package is required for GroqProvider. "
                 "Add 'groq>=0.9.0' to requirements.txt"
-            ) from exc
+            )
 
-        self._client = AsyncGroq(api_key=settings.groq_api_key.get_secret_value())
+        self._client = _groq_client(settings.groq_api_key.get_secret_value(), self._http)
         self._model = settings.groq_model               # llama-3.3-70b-versatile
         self._vision_model = settings.groq_vision_model # llama-3.2-90b-vision-preview
+        self._renderer = FakeProvider()
+        self._batch_limit = asyncio.Semaphore(settings.groq_max_concurrent)
 
     # ── Analyze room (vision) ─────────────────────────────────────────────────
 
     async def analyze_room(self, image_bytes: bytes, filename: str) -> dict:
         """Send room photo to Groq vision model and return structured JSON analysis."""
-        import base64, json as _json, re
-
-        b64 = base64.b64encode(image_bytes).decode()
-        mime = "image/jpeg"
-        if filename.lower().endswith(".png"):
-            mime = "image/png"
-        elif filename.lower().endswith(".webp"):
-            mime = "image/webp"
-
-        system = (
-            "You are an expert interior designer AI. "
-            "Respond ONLY with a valid JSON object — no markdown, no explanation."
-        )
-        user = (
-            "Analyze this room photograph and return JSON with this exact schema:\n"
-            '{"room_type":string,"dimensions":{"width":number,"height":number,"depth":number},'
-            '"lighting":string,"existing_features":[string],"style_hints":[string],"confidence":number}\n'
-            "All measurements in metres. confidence is 0.0–1.0."
-        )
+        # Multi-MB photos are encoded in a worker thread so concurrent requests
+        # don't queue behind the base64 pass; small ones aren't worth the hop.
+        if len(image_bytes) > _INLINE_B64_MAX:
+            b64 = await asyncio.to_thread(_b64_ascii, image_bytes)
+        else:
+            b64 = _b64_ascii(image_bytes)
+        mime = _MIME_BY_EXT.get(os.path.splitext(filename)[1].lower(), "image/jpeg")
 
         response = await self._client.chat.completions.create(
             model=self._vision_model,
             messages=[
-                {"role": "system", "content": system},
+                {"role": "system", "content": _ANALYZE_SYSTEM},
                 {
                     "role": "user",
                     "content": [
-                        {"type": "text", "text": user},
-                        {"type": "image_url", "image_url": {"url": f"data:{mime};base64,{b64}"}},
+                        {"type": "text", "text": _ANALYZE_PROMPT},
+                        {"type": "image_url", "image_url": {"url": "data:" + mime + ";base64," + b64}},
                     ],
                 },
             ],
@@ -310,28 +631,22 @@ class GroqProvider(BaseAIProvider):
         raw = response.choices[0].message.content or ""
         logger.debug("Groq analyze_room raw: %s", raw)
 
-        # Extract JSON even if model wraps it in markdown
-        match = re.search(r"\{.*\}", raw, re.DOTALL)
-        return _json.loads(match.group() if match else raw)
+        return _extract_json(raw)
 
     # ── Generate design (text) ────────────────────────────────────────────────
 
     async def generate_design(self, analysis: dict, style: str, preferences: dict) -> dict:
         """Ask Groq to generate a full furniture layout. Uses JSON mode (supported on llama-3.3)."""
-        import json as _json
-
-        prompt = (
-            f"You are an expert interior designer AI.\n"
-            f"Room analysis: {_json.dumps(analysis)}\n"
-            f"Style: {style}\nUser preferences: {_json.dumps(preferences)}\n\n"
-            "Return ONLY valid JSON with this exact schema:\n"
-            '{"style":string,"furniture":[{"id":string,"name":string,"category":string,'
-            '"style":string,"color":string,"position":{"x":number,"y":number,"z":number},'
-            '"rotation":number,"dimensions":{"w":number,"h":number,"d":number},'
-            '"model_url":null,"price_usd":number,"vendor":string,"sku":string}],'
-            '"layout_notes":string,"color_palette":[string],"estimated_cost_usd":number}\n'
-            "Include 4–6 furniture items. Dimensions in metres."
-        )
+        prompt = "".join((
+            "You are an expert interior designer AI.\nRoom analysis: ",
+            orjson.dumps(analysis).decode(),
+            "\nStyle: ",
+            style,
+            "\nUser preferences: ",
+            orjson.dumps(preferences).decode(),
+            "\n\n",
+            _DESIGN_SCHEMA,
+        ))
 
         response = await self._client.chat.completions.create(
             model=self._model,
@@ -343,34 +658,64 @@ class GroqProvider(BaseAIProvider):
 
         raw = response.choices[0].message.content or ""
         logger.debug("Groq generate_design raw: %s", raw)
-        return _json.loads(raw)
+        return orjson.loads(raw)
+
+    # ── Batch pipeline ────────────────────────────────────────────────────────
+
+    async def batch_analyze_and_design(
+        self,
+        items: list[tuple[bytes, str]],
+        style: str,
+        preferences: dict,
+    ) -> list[tuple[dict, dict]]:
+        """
+        Analyze + design several room photos concurrently.
+        Each item's design call starts as soon as its own analysis lands; at most
+        GROQ_MAX_CONCURRENT requests are in flight. Returns (analysis, design)
+        pairs in input order. The first failure cancels the remaining pipelines
+        and is re-raised as-is.
+        """
+
+        async def pipeline(image_bytes: bytes, filename: str) -> tuple[dict, dict]:
+            async with self._batch_limit:
+                analysis = await self.analyze_room(image_bytes, filename)
+            async with self._batch_limit:
+                design = await self.generate_design(analysis, style, preferences)
+            return analysis, design
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(pipeline(b, f)) for b, f in items]
+        except BaseExceptionGroup as eg:
+            raise eg.exceptions[0] from None
+        return [task.result() for task in tasks]
 
     # ── Render (delegated to FakeProvider) ───────────────────────────────────
 
     async def render_design(self, design: dict) -> bytes:
         """Groq has no image generation — delegates to FakeProvider placeholder."""
         logger.info("GroqProvider: render_design → FakeProvider (no image gen on Groq)")
-        return await FakeProvider().render_design(design)
+        return await self._renderer.render_design(design)
+
+    async def render_design_to(self, design: dict, path: str) -> None:
+        await self._renderer.render_design_to(design, path)
 
     # ── Procurement stream (text + streaming) ─────────────────────────────────
 
     async def procure(self, design: dict, budget: float | None, vendors: list[str]):
         """Stream Groq's procurement analysis as SSE events via streaming chat."""
-        import json as _json
-
         furniture = design.get("furniture", [])
         budget_str = f"${budget}" if budget else "no fixed budget"
 
         prompt = (
             f"You are a procurement specialist AI.\n"
             f"Design has {len(furniture)} furniture items:\n"
-            f"{_json.dumps(furniture, indent=2)}\n\n"
+            f"{orjson.dumps(furniture, option=orjson.OPT_INDENT_2).decode()}\n\n"
             f"Budget: {budget_str}\nPreferred vendors: {vendors or ['any']}\n\n"
-            "For each item: find the best real purchase source, suggest budget alternatives, "
-            "give realistic price. End with total cost and savings summary."
+            + _PROCURE_INSTRUCTIONS
         )
 
-        yield {"event": "thought", "data": f"Analysing {len(furniture)} items — budget {budget_str}"}
+        yield sse_frame("thought", f"Analysing {len(furniture)} items — budget {budget_str}")
 
         stream = await self._client.chat.completions.create(
             model=self._model,
@@ -380,24 +725,35 @@ class GroqProvider(BaseAIProvider):
             temperature=0.5,
         )
 
+        # Coalesce token deltas into fewer, larger SSE frames: flush once
+        # _FLUSH_CHARS characters or _FLUSH_MS milliseconds accumulate.
+        loop = asyncio.get_running_loop()
         buffer = ""
+        pending: list[str] = []
+        pending_chars = 0
+        last_flush = loop.time()
         async for chunk in stream:
             delta = chunk.choices[0].delta.content or ""
             if delta:
                 buffer += delta
-                yield {"event": "thought", "data": delta}
-
-        total = sum(p.get("price_usd", 0) for p in furniture)
+                pending.append(delta)
+                pending_chars += len(delta)
+                if pending_chars >= _FLUSH_CHARS or loop.time() - last_flush >= _FLUSH_MS / 1000:
+                    yield sse_frame("thought", "".join(pending))
+                    pending.clear()
+                    pending_chars = 0
+                    last_flush = loop.time()
+        if pending:
+            yield sse_frame("thought", "".join(pending))
+
+        total = _furniture_total(furniture)
         within_budget = budget is None or total <= budget
-        yield {
-            "event": "summary",
-            "data": {
-                "total_usd": round(total, 2),
-                "within_budget": within_budget,
-                "items": len(furniture),
-                "groq_analysis": buffer[-500:] if buffer else "",
-            },
-        }
+        yield sse_frame("summary", {
+            "total_usd": round(total, 2),
+            "within_budget": within_budget,
+            "items": len(furniture),
+            "groq_analysis": buffer[-500:] if buffer else "",
+        })
 
 
 # ── Factory ───────────────────────────────────────────────────────────────────
@@ -408,9 +764,31 @@ _PROVIDERS: dict[str, type[BaseAIProvider]] = {
 }
 
 
-def get_ai_provider() -> BaseAIProvider:
+_provider: BaseAIProvider | None = None
+
+
+def get_ai_provider(request: Request) -> BaseAIProvider:
     """FastAPI dependency — returns the configured AI provider singleton."""
-    provider_cls = _PROVIDERS.get(settings.ai_provider, FakeProvider)
-    logger.info("AI provider: %s", settings.ai_provider)
-    return provider_cls()
+    global _provider
+    if _provider is None:
+        provider_cls = _PROVIDERS.get(settings.ai_provider, FakeProvider)
+        logger.info("AI provider: %s", settings.ai_provider)
+        _provider = provider_cls(http_client=request.app.state.http)
+    return _provider
+
+
+async def close_ai_provider() -> None:
+    """
+    Lifespan shutdown hook — release the singleton so the next startup rebuilds
+    it, close any Groq HTTP pools this module created for itself, and stop the
+    render pool.
+    """
+    global _provider, _render_executor
+    if _provider is not None:
+        await _provider.aclose()
+        _provider = None
+    await _close_groq_clients()
+    if _render_executor is not None:
+        _render_executor.shutdown(wait=False, cancel_futures=True)
+        _render_executor = None
 
@@ -11,11 +11,27 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timezone
 from typing import Any
 
+import aiofiles
+
+from app.config import get_settings
+
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Finished jobs are forgotten an hour after they finish, or sooner (oldest
+# finished first) once the table reaches _MAX_JOBS. Pending/processing jobs
+# are never evicted.
+_MAX_JOBS = 10_000
+_JOB_TTL_S = 3600.0
+
+# Micro-batching: wait at most this long for more jobs to join a batch.
+_BATCH_WAIT_S = 0.05
 
 
 class JobStatus:
@@ -24,6 +40,8 @@ class JobStatus:
     DONE = "done"
     FAILED = "failed"
 
+    TERMINAL = frozenset({DONE, FAILED})
+
 
 class RenderJob:
     def __init__(self, job_id: str, design_id: str) -> None:
@@ -32,10 +50,20 @@ class RenderJob:
         self.status: str = JobStatus.PENDING
         self.image_url: str | None = None
         self.error: str | None = None
-        self.created_at: datetime = datetime.now(timezone.utc)
-        self.updated_at: datetime = self.created_at
+        # Epoch seconds — time.time() is far cheaper than an aware datetime;
+        # datetimes are only built when a job is serialised.
+        self.created_ts: float = time.time()
+        self.updated_ts: float = self.created_ts
         self._task: asyncio.Task | None = None
 
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self.created_ts, timezone.utc)
+
+    @property
+    def updated_at(self) -> datetime:
+        return datetime.fromtimestamp(self.updated_ts, timezone.utc)
+
     def to_dict(self) -> dict[str, Any]:
         return {
             "job_id": self.job_id,
@@ -48,15 +76,113 @@ class RenderJob:
         }
 
 
+class RenderBatcher:
+    """
+    Collects concurrent render requests into provider.render_design_batch()
+    calls of up to ``max_batch_size`` designs, waiting at most _BATCH_WAIT_S
+    after the first request for the batch to fill.
+    """
+
+    def __init__(self, ai_provider, max_batch_size: int) -> None:
+        self.ai_provider = ai_provider
+        self._max_batch_size = max_batch_size
+        self._pending: asyncio.Queue[tuple[dict, asyncio.Future]] = asyncio.Queue()
+        self._collector: asyncio.Task | None = None
+        self._dispatching: set[asyncio.Task] = set()  # strong refs until each batch finishes
+
+    async def render(self, design: dict) -> bytes:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.put_nowait((design, future))
+        if self._collector is None or self._collector.done():
+            self._collector = asyncio.create_task(self._collect(), name="render-batcher")
+        return await future
+
+    def close(self) -> None:
+        """
+        Stop collecting. Batches already dispatched still finish; requests that
+        were queued but not yet batched fail instead of waiting forever.
+        """
+        if self._collector is not None:
+            self._collector.cancel()
+            self._collector = None
+        while not self._pending.empty():
+            _, future = self._pending.get_nowait()
+            _fail(future, RuntimeError("Render batcher closed"))
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._pending.get()]
+            try:
+                deadline = loop.time() + _BATCH_WAIT_S
+                while len(batch) < self._max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._pending.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    _fail(future, RuntimeError("Render batcher closed"))
+                raise
+            # Dispatch and keep collecting — the next batch can fill meanwhile.
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatching.add(task)
+            task.add_done_callback(self._dispatching.discard)
+
+    async def _dispatch(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        try:
+            results = await self.ai_provider.render_design_batch([design for design, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"render_design_batch returned {len(results)} results for {len(batch)} designs"
+                )
+        except Exception as exc:
+            for _, future in batch:
+                _fail(future, exc)
+            return
+        for (_, future), image_bytes in zip(batch, results):
+            if not future.done():
+                future.set_result(image_bytes)
+
+
+def _fail(future: asyncio.Future, exc: BaseException) -> None:
+    if not future.done():
+        future.set_exception(exc)
+
+
 class RenderQueue:
     """Thread-safe (asyncio) in-memory job queue."""
 
     def __init__(self) -> None:
         self._jobs: dict[str, RenderJob] = {}
+        # Finished job IDs → completion time, in completion order. Eviction only
+        # ever looks here, so running jobs cost nothing to skip.
+        self._finished: OrderedDict[str, float] = OrderedDict()
+        # Jobs submit instantly but only this many render at once.
+        self._sem = asyncio.Semaphore(max(1, settings.max_concurrent_renders))
+        self._batcher: RenderBatcher | None = None
+        self._dirs_ready: set[str] = set()  # renders dirs already created
 
     def get_job(self, job_id: str) -> RenderJob | None:
         return self._jobs.get(job_id)
 
+    def _evict(self) -> None:
+        """Drop finished jobs past the TTL, then oldest finished while at the cap."""
+        cutoff = time.time() - _JOB_TTL_S
+        while self._finished:
+            job_id, finished_ts = next(iter(self._finished.items()))
+            if finished_ts >= cutoff and len(self._jobs) < _MAX_JOBS:
+                break
+            del self._finished[job_id]
+            del self._jobs[job_id]
+
+    def _mark_finished(self, job: RenderJob) -> None:
+        if self._jobs.get(job.job_id) is job:  # not superseded by a re-submit
+            self._finished[job.job_id] = job.updated_ts
+
     async def submit(
         self,
         design_id: str,
@@ -66,8 +192,10 @@ class RenderQueue:
         backend_public_url: str,
         job_id: str | None = None,  # caller can pin the ID (keeps DB + queue in sync)
     ) -> RenderJob:
-        job_id = job_id or str(uuid.uuid4())
+        job_id = job_id or str(uuid.uuid4())  # dashed — matches the status route's UUID path param
         job = RenderJob(job_id=job_id, design_id=design_id)
+        self._evict()
+        self._finished.pop(job_id, None)  # a re-submitted ID is running again
         self._jobs[job_id] = job
 
         task = asyncio.create_task(
@@ -78,6 +206,13 @@ class RenderQueue:
         logger.info("Render job %s submitted for design %s", job_id, design_id)
         return job
 
+    def _batcher_for(self, ai_provider) -> RenderBatcher:
+        if self._batcher is None or self._batcher.ai_provider is not ai_provider:
+            if self._batcher is not None:
+                self._batcher.close()  # provider was rebuilt — retire the old collector
+            self._batcher = RenderBatcher(ai_provider, ai_provider.render_batch_size)
+        return self._batcher
+
     async def _run(
         self,
         job: RenderJob,
@@ -85,19 +220,35 @@ class RenderQueue:
         ai_provider,
         renders_dir: str,
         backend_public_url: str,
+    ) -> None:
+        async with self._sem:
+            await self._render(job, design_data, ai_provider, renders_dir, backend_public_url)
+
+    async def _render(
+        self,
+        job: RenderJob,
+        design_data: dict,
+        ai_provider,
+        renders_dir: str,
+        backend_public_url: str,
     ) -> None:
         job.status = JobStatus.PROCESSING
-        job.updated_at = datetime.now(timezone.utc)
+        job.updated_ts = time.time()
 
         try:
-            image_bytes: bytes = await ai_provider.render_design(design_data)
-
-            os.makedirs(renders_dir, exist_ok=True)
-            filename = f"{job.job_id}.png"
+            if renders_dir not in self._dirs_ready:
+                await asyncio.to_thread(os.makedirs, renders_dir, exist_ok=True)
+                self._dirs_ready.add(renders_dir)
+            filename = f"{job.job_id}{ai_provider.render_ext}"
             filepath = os.path.join(renders_dir, filename)
 
-            with open(filepath, "wb") as f:
-                f.write(image_bytes)
+            if ai_provider.render_batch_size > 1:
+                image_bytes = await self._batcher_for(ai_provider).render(design_data)
+                async with aiofiles.open(filepath, "wb") as f:
+                    await f.write(image_bytes)
+            else:
+                # Provider writes the file itself — no blocking write on the loop.
+                await ai_provider.render_design_to(design_data, filepath)
 
             job.image_url = f"{backend_public_url}/static/renders/{filename}"
             job.status = JobStatus.DONE
@@ -109,7 +260,9 @@ class RenderQueue:
             job.error = str(exc)
 
         finally:
-            job.updated_at = datetime.now(timezone.utc)
+            job.updated_ts = time.time()
+            if job.status in JobStatus.TERMINAL:
+                self._mark_finished(job)
 
 
 # ── Singleton ─────────────────────────────────────────────────────────────────
@@ -0,0 +1,13 @@
+"""Test settings — must be in the environment before any app module is imported."""
+
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="spaceforge-tests-")
+os.environ.setdefault("BACKEND_PUBLIC_URL", "http://test")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_tmp}/test.db")
+os.environ.setdefault("STATIC_DIR", f"{_tmp}/static")
+os.environ.setdefault("AI_PROVIDER", "fake")
+
+# StaticFiles checks its directory when app.main is imported, before the lifespan runs.
+os.makedirs(os.environ["STATIC_DIR"], exist_ok=True)
@@ -0,0 +1,95 @@
+"""Upgrading a database created with the legacy VARCHAR(36) id layout."""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from app.database import Base, upgrade_legacy_schema
+from app.models.db_models import Design, RenderJob, Room
+
+# DDL as emitted by the original String(36)/Text models.
+_LEGACY_DDL = (
+    "CREATE TABLE rooms (id VARCHAR(36) NOT NULL, filename VARCHAR(255) NOT NULL, "
+    "file_url VARCHAR(512), analysis_json TEXT, created_at DATETIME NOT NULL, PRIMARY KEY (id))",
+    "CREATE TABLE designs (id VARCHAR(36) NOT NULL, room_id VARCHAR(36) NOT NULL, style VARCHAR(100), "
+    "design_json TEXT, created_at DATETIME NOT NULL, PRIMARY KEY (id), "
+    "FOREIGN KEY(room_id) REFERENCES rooms (id))",
+    "CREATE TABLE render_jobs (id VARCHAR(36) NOT NULL, design_id VARCHAR(36) NOT NULL, "
+    "status VARCHAR(20) NOT NULL, image_url VARCHAR(512), error TEXT, created_at DATETIME NOT NULL, "
+    "updated_at DATETIME NOT NULL, PRIMARY KEY (id), FOREIGN KEY(design_id) REFERENCES designs (id))",
+)
+
+ROOM_ID = uuid.uuid4()
+DESIGN_ID = uuid.uuid4()
+JOB_ID = uuid.uuid4()
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    with engine.begin() as conn:
+        for ddl in _LEGACY_DDL:
+            conn.execute(text(ddl))
+        now = "2025-01-01 00:00:00.000000"
+        conn.execute(text("INSERT INTO rooms VALUES (:id, 'room.jpg', NULL, :a, :t)"),
+                     {"id": str(ROOM_ID), "a": '{"room_type": "bedroom"}', "t": now})
+        conn.execute(text("INSERT INTO designs VALUES (:id, :room, 'modern', :d, :t)"),
+                     {"id": str(DESIGN_ID), "room": str(ROOM_ID), "d": '{"style": "modern"}', "t": now})
+        conn.execute(text("INSERT INTO render_jobs VALUES (:id, :design, 'done', NULL, NULL, :t, :t)"),
+                     {"id": str(JOB_ID), "design": str(DESIGN_ID), "t": now})
+    yield engine
+    engine.dispose()
+
+
+def _upgrade(engine) -> None:
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn)
+        upgrade_legacy_schema(conn)
+
+
+def test_legacy_rows_are_found_by_uuid_after_upgrade(legacy_engine):
+    _upgrade(legacy_engine)
+    with Session(legacy_engine) as session:
+        room = session.get(Room, ROOM_ID)
+        design = session.get(Design, DESIGN_ID)
+        job = session.get(RenderJob, JOB_ID)
+        assert room is not None and room.analysis_json == {"room_type": "bedroom"}
+        assert design is not None and design.room_id == ROOM_ID and design.design_json == {"style": "modern"}
+        assert job is not None and job.design_id == DESIGN_ID
+
+
+def test_upgrade_is_idempotent_and_adds_indexes(legacy_engine):
+    _upgrade(legacy_engine)
+    _upgrade(legacy_engine)
+    index_names = {ix["name"] for ix in inspect(legacy_engine).get_indexes("designs")}
+    assert "ix_designs_room_id_created" in index_names
+    with legacy_engine.connect() as conn:
+        assert conn.execute(text("SELECT id FROM rooms")).scalar_one() == ROOM_ID.hex
+
+
+def test_current_layout_is_left_alone(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/fresh.db")
+    _upgrade(engine)
+    with Session(engine) as session:
+        session.add(Room(filename="a.jpg"))
+        session.commit()
+    engine.dispose()
+
+
+def test_new_rows_can_be_written_to_an_upgraded_legacy_db(legacy_engine):
+    # Legacy tables have no server-side id default — the ORM must send the id.
+    _upgrade(legacy_engine)
+    with Session(legacy_engine) as session:
+        room = Room(filename="new.jpg", analysis_json={"room_type": "kitchen"})
+        session.add(room)
+        session.flush()
+        design = Design(room_id=room.id, style="modern", design_json={})
+        session.add(design)
+        session.flush()
+        session.add(RenderJob(design_id=design.id))
+        session.commit()
+        assert session.get(Room, room.id).filename == "new.jpg"
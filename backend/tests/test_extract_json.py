@@ -0,0 +1,52 @@
+"""_extract_json: pulling a JSON object out of a model reply."""
+
+from __future__ import annotations
+
+import orjson
+import pytest
+
+from app.services.ai_provider import _extract_json
+
+
+def test_clean_json():
+    assert _extract_json('{"room_type": "bedroom", "area": 12}') == {"room_type": "bedroom", "area": 12}
+
+
+def test_fenced_json():
+    raw = '```json\n{"style": "modern"}\n```'
+    assert _extract_json(raw) == {"style": "modern"}
+
+
+def test_braces_inside_strings_do_not_end_the_object():
+    raw = 'Here you go: {"note": "use {curly} braces }", "n": 1} thanks'
+    assert _extract_json(raw) == {"note": "use {curly} braces }", "n": 1}
+
+
+def test_escaped_quotes_inside_strings():
+    raw = 'Result: {"name": "the \\"big\\" sofa {", "ok": true}'
+    assert _extract_json(raw) == {"name": 'the "big" sofa {', "ok": True}
+
+
+def test_prose_before_and_after():
+    raw = 'Sure! Below is the layout.\n{"furniture": [{"name": "Bed"}]}\nLet me know if you need changes.'
+    assert _extract_json(raw) == {"furniture": [{"name": "Bed"}]}
+
+
+def test_first_of_several_objects_wins():
+    assert _extract_json('{"a": 1} and then {"b": 2}') == {"a": 1}
+
+
+def test_no_object_raises():
+    with pytest.raises(orjson.JSONDecodeError):
+        _extract_json("I could not analyse this image.")
+
+
+def test_unbalanced_object_raises():
+    with pytest.raises(ValueError):
+        _extract_json('prefix {"a": {"b": 1}')
+
+
+@pytest.mark.parametrize("raw", ['[{"a": 1}]', '"text"', "42", "null"])
+def test_top_level_non_object_raises(raw):
+    with pytest.raises(ValueError, match="expected a JSON object"):
+        _extract_json(raw)
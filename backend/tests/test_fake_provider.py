@@ -0,0 +1,81 @@
+"""FakeProvider placeholder render cache."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services import ai_provider
+from app.services.ai_provider import FakeProvider, _render_inputs, _render_sync
+
+pytestmark = pytest.mark.skipif(ai_provider.Image is None, reason="Pillow not installed")
+
+_FURNITURE = [{"name": "Sofa"}, {"name": "Coffee Table"}]
+
+
+@pytest.fixture(autouse=True)
+def empty_render_cache():
+    ai_provider._RENDER_CACHE.clear()
+    yield
+    ai_provider._RENDER_CACHE.clear()
+
+
+def _render(design: dict) -> bytes:
+    return asyncio.run(FakeProvider().render_design(design))
+
+
+def test_missing_and_empty_palette_get_distinct_renders():
+    missing = {"style": "modern", "furniture": _FURNITURE}
+    empty = {"style": "modern", "furniture": _FURNITURE, "color_palette": []}
+    assert _render_inputs(missing) != _render_inputs(empty)
+
+    first, second = _render(missing), _render(empty)
+    assert first != second
+    assert first == _render_sync(_render_inputs(missing))
+    assert second == _render_sync(_render_inputs(empty))
+
+
+def test_missing_style_matches_explicit_default():
+    assert _render_inputs({"furniture": _FURNITURE}) == _render_inputs({"style": "modern", "furniture": _FURNITURE})
+
+
+def test_only_the_first_six_labels_matter():
+    base = [{"name": f"Piece {i}"} for i in range(6)]
+    assert _render_inputs({"furniture": base}) == _render_inputs({"furniture": base + [{"name": "Extra"}]})
+    # Names are truncated to what is actually drawn.
+    assert _render_inputs({"furniture": [{"name": "Bookshelf Deluxe"}]})[2] == ("Bookshelf ",)
+
+
+def test_pieces_without_a_name_still_render():
+    design = {"furniture": [{"category": "table"}, "not-a-dict", {"name": None}]}
+    assert _render_inputs(design)[2] == (None, None, None)
+    assert _render(design) == _render_sync(_render_inputs(design))
+
+
+def test_repeat_render_is_served_from_cache():
+    design = {"style": "industrial", "furniture": _FURNITURE, "color_palette": ["#3D3D3D", "#B87333"]}
+    first = _render(design)
+    assert list(ai_provider._RENDER_CACHE.values()) == [first]
+    assert _render(dict(design)) is first
+
+
+def test_renders_run_on_the_dedicated_pool_not_the_default_executor(monkeypatch):
+    threads: list[str] = []
+    real_render_sync = ai_provider._render_sync
+
+    def recording_render_sync(*args):
+        threads.append(threading.current_thread().name)
+        return real_render_sync(*args)
+
+    monkeypatch.setattr(ai_provider, "_render_sync", recording_render_sync)
+
+    async def scenario():
+        await FakeProvider().render_design({"style": "boho", "furniture": _FURNITURE})
+        assert ai_provider._render_executor is not None
+        await ai_provider.close_ai_provider()
+        assert ai_provider._render_executor is None
+
+    asyncio.run(scenario())
+    assert len(threads) == 1 and threads[0].startswith("spaceforge-render")
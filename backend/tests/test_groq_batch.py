@@ -0,0 +1,85 @@
+"""GroqProvider.batch_analyze_and_design against a stubbed Groq client."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import re
+import types
+
+import orjson
+import pytest
+
+from app.services import ai_provider as ap
+
+pytestmark = pytest.mark.skipif(ap.AsyncGroq is None, reason="groq not installed")
+
+_LIMIT = 2
+
+
+class StubCompletions:
+    """Echoes the room name back through analysis and design, tracking concurrency."""
+
+    def __init__(self, vision_model: str) -> None:
+        self.vision_model = vision_model
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.cancelled = 0
+
+    async def create(self, *, model: str, messages: list, **_):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if model == self.vision_model:
+                url = messages[1]["content"][1]["image_url"]["url"]
+                room = base64.b64decode(url.split(",", 1)[1]).decode()
+                if room == "boom":
+                    raise RuntimeError("groq exploded")
+                # Later rooms answer first, so completion order differs from input order.
+                await asyncio.sleep(0.01 * (10 - int(room.split("-")[1])))
+                content = orjson.dumps({"room": room}).decode()
+            else:
+                room = re.search(r'"room":"([^"]+)"', messages[-1]["content"]).group(1)
+                await asyncio.sleep(0.005)
+                content = orjson.dumps({"design_for": room}).decode()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        message = types.SimpleNamespace(content=content)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    monkeypatch.setitem(ap.settings.__dict__, "groq_max_concurrent", _LIMIT)
+    stub = StubCompletions(ap.settings.groq_vision_model)
+    client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=stub))
+    monkeypatch.setattr(ap, "_groq_client", lambda api_key, http_client: client)
+    return ap.GroqProvider(), stub
+
+
+def test_results_keep_input_order_within_the_concurrency_limit(provider):
+    groq, stub = provider
+    items = [(f"room-{i}".encode(), f"room-{i}.jpg") for i in range(6)]
+
+    results = asyncio.run(groq.batch_analyze_and_design(items, "modern", {}))
+
+    assert [analysis["room"] for analysis, _ in results] == [f"room-{i}" for i in range(6)]
+    assert [design["design_for"] for _, design in results] == [f"room-{i}" for i in range(6)]
+    assert stub.max_in_flight == _LIMIT
+
+
+def test_first_failure_cancels_the_rest_and_is_reraised(provider):
+    groq, stub = provider
+    items = [(b"room-1", "a.jpg"), (b"boom", "b.jpg"), (b"room-2", "c.jpg")]
+
+    async def scenario():
+        with pytest.raises(RuntimeError, match="groq exploded"):
+            await groq.batch_analyze_and_design(items, "modern", {})
+        # Checked before asyncio.run tears the loop down: siblings are already gone.
+        assert stub.cancelled >= 1
+        assert stub.in_flight == 0
+
+    asyncio.run(scenario())
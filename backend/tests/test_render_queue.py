@@ -0,0 +1,166 @@
+"""RenderQueue micro-batching with a stub batch-capable provider."""
+
+from __future__ import annotations
+
+import asyncio
+
+from app.services import render_queue
+from app.services.ai_provider import BaseAIProvider
+from app.services.render_queue import JobStatus, RenderBatcher, RenderQueue
+
+
+class BatchProvider(BaseAIProvider):
+    """Renders one byte string per design; optionally drops results to simulate a bad backend."""
+
+    render_batch_size = 4
+
+    def __init__(self, drop: int = 0) -> None:
+        super().__init__()
+        self.batches: list[int] = []
+        self._drop = drop
+
+    async def analyze_room(self, image_bytes: bytes, filename: str) -> dict:
+        raise NotImplementedError
+
+    async def generate_design(self, analysis: dict, style: str, preferences: dict) -> dict:
+        raise NotImplementedError
+
+    async def render_design(self, design: dict) -> bytes:
+        return f"img-{design['n']}".encode()
+
+    async def render_design_batch(self, designs: list[dict]) -> list[bytes]:
+        self.batches.append(len(designs))
+        results = await super().render_design_batch(designs)
+        return results[: len(results) - self._drop]
+
+    async def procure(self, design: dict, budget: float | None, vendors: list[str]):
+        yield b""
+
+
+async def _submit_all(queue: RenderQueue, provider: BaseAIProvider, renders_dir, count: int):
+    jobs = [
+        await queue.submit(f"design-{n}", {"n": n}, provider, str(renders_dir), "http://test")
+        for n in range(count)
+    ]
+    await asyncio.wait_for(asyncio.gather(*(job._task for job in jobs)), timeout=5)
+    return jobs
+
+
+def test_concurrent_jobs_are_grouped_into_batches(tmp_path):
+    async def scenario():
+        provider = BatchProvider()
+        jobs = await _submit_all(RenderQueue(), provider, tmp_path, 6)
+        assert provider.batches == [4, 2]
+        assert {job.status for job in jobs} == {JobStatus.DONE}
+        for n, job in enumerate(jobs):
+            assert (tmp_path / f"{job.job_id}.png").read_bytes() == f"img-{n}".encode()
+
+    asyncio.run(scenario())
+
+
+def test_short_batch_result_fails_every_job_and_frees_slots(tmp_path):
+    async def scenario():
+        queue = RenderQueue()
+        queue._sem = asyncio.Semaphore(4)
+        jobs = await _submit_all(queue, BatchProvider(drop=1), tmp_path, 4)
+        assert {job.status for job in jobs} == {JobStatus.FAILED}
+        assert "3 results for 4 designs" in jobs[0].error
+        # Every semaphore slot came back — later jobs still run.
+        later = await _submit_all(queue, BatchProvider(), tmp_path, 4)
+        assert {job.status for job in later} == {JobStatus.DONE}
+
+    asyncio.run(scenario())
+
+
+def test_replacing_the_provider_closes_the_old_collector(tmp_path):
+    async def scenario():
+        queue = RenderQueue()
+        await _submit_all(queue, BatchProvider(), tmp_path, 1)
+        old = queue._batcher
+        collector = old._collector
+        await _submit_all(queue, BatchProvider(), tmp_path, 1)
+        assert queue._batcher is not old
+        await asyncio.sleep(0)
+        assert collector.cancelled()
+
+    asyncio.run(scenario())
+
+
+def test_close_fails_requests_that_were_never_batched(monkeypatch):
+    async def scenario():
+        monkeypatch.setattr(render_queue, "_BATCH_WAIT_S", 10.0)
+        batcher = RenderBatcher(BatchProvider(), max_batch_size=4)
+        pending = asyncio.ensure_future(batcher.render({"n": 0}))
+        await asyncio.sleep(0.01)  # collector holds a partial batch, waiting to fill
+        batcher.close()
+        try:
+            await asyncio.wait_for(pending, timeout=1)
+        except RuntimeError as exc:
+            assert "closed" in str(exc)
+        else:
+            raise AssertionError("render() should fail once the batcher is closed")
+
+    asyncio.run(scenario())
+
+
+# ── Job table eviction ────────────────────────────────────────────────────────
+
+
+def _add_job(queue: RenderQueue, job_id: str, status: str, finished_ts: float | None = None):
+    job = render_queue.RenderJob(job_id=job_id, design_id="design")
+    job.status = status
+    queue._evict()
+    queue._jobs[job_id] = job
+    if finished_ts is not None:
+        job.updated_ts = finished_ts
+        queue._mark_finished(job)
+    return job
+
+
+def test_finished_jobs_expire_after_ttl_measured_from_completion(monkeypatch):
+    queue = RenderQueue()
+    now = 10_000.0
+    monkeypatch.setattr(render_queue.time, "time", lambda: now)
+    ttl = render_queue._JOB_TTL_S
+    _add_job(queue, "expired", JobStatus.DONE, finished_ts=now - ttl - 1)
+    _add_job(queue, "fresh", JobStatus.FAILED, finished_ts=now - 1)
+    _add_job(queue, "running", JobStatus.PROCESSING)
+    queue._evict()
+    assert set(queue._jobs) == {"fresh", "running"}
+
+
+def test_cap_evicts_oldest_finished_and_never_running_jobs(monkeypatch):
+    monkeypatch.setattr(render_queue, "_MAX_JOBS", 3)
+    queue = RenderQueue()
+    now = render_queue.time.time()
+    _add_job(queue, "running-1", JobStatus.PROCESSING)
+    _add_job(queue, "done-old", JobStatus.DONE, finished_ts=now - 20)
+    _add_job(queue, "done-new", JobStatus.DONE, finished_ts=now - 10)
+    _add_job(queue, "next", JobStatus.PENDING)
+    assert set(queue._jobs) == {"running-1", "done-new", "next"}
+    _add_job(queue, "another", JobStatus.PENDING)
+    assert set(queue._jobs) == {"running-1", "next", "another"}
+    # Nothing finished is left — running jobs are kept even over the cap.
+    _add_job(queue, "overflow", JobStatus.PENDING)
+    assert set(queue._jobs) == {"running-1", "next", "another", "overflow"}
+    assert not queue._finished
+
+
+class SlowProvider(BatchProvider):
+    render_batch_size = 1
+
+    async def render_design(self, design: dict) -> bytes:
+        await asyncio.sleep(design["delay"])
+        return b"img"
+
+
+def test_jobs_enter_eviction_order_when_they_finish_not_when_submitted(tmp_path):
+    async def scenario():
+        queue = RenderQueue()
+        provider = SlowProvider()
+        slow = await queue.submit("d1", {"delay": 0.1}, provider, str(tmp_path), "http://test")
+        fast = await queue.submit("d2", {"delay": 0.0}, provider, str(tmp_path), "http://test")
+        await asyncio.wait_for(asyncio.gather(slow._task, fast._task), timeout=5)
+        assert list(queue._finished) == [fast.job_id, slow.job_id]
+
+    asyncio.run(scenario())
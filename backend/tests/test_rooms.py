@@ -0,0 +1,68 @@
+"""POST /api/rooms/analyze — upload validation."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.main import app
+
+settings = get_settings()
+
+_JPEG = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00"
+_PNG = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR"
+_WEBP = b"RIFF\x24\x00\x00\x00WEBPVP8 "
+_HEIC = b"\x00\x00\x00\x18ftypheic\x00\x00\x00\x00"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+def _upload(client: TestClient, name: str, body: bytes, content_type: str):
+    return client.post("/api/rooms/analyze", files={"file": (name, body, content_type)})
+
+
+@pytest.mark.parametrize(
+    ("name", "head", "content_type"),
+    [
+        ("room.jpg", _JPEG, "image/jpeg"),
+        ("room.png", _PNG, "image/png"),
+        ("room.webp", _WEBP, "image/webp"),
+        ("room.heic", _HEIC, "image/heic"),
+    ],
+)
+def test_supported_image_headers_are_accepted(client, name, head, content_type):
+    res = _upload(client, name, head + b"\x00" * 64, content_type)
+    assert res.status_code == 200, res.text
+    assert res.json()["filename"] == name
+
+
+def test_spoofed_content_type_is_rejected(client):
+    res = _upload(client, "evil.jpg", b"<?php echo 'hi'; ?>" + b"\x00" * 64, "image/jpeg")
+    assert res.status_code == 415
+    assert not os.path.exists(os.path.join(settings.uploads_dir, "evil.jpg"))
+
+
+def test_unsupported_content_type_is_rejected(client):
+    res = _upload(client, "room.gif", b"GIF89a" + b"\x00" * 64, "image/gif")
+    assert res.status_code == 415
+
+
+def test_oversized_upload_is_rejected_without_touching_existing_file(client, monkeypatch):
+    original = _JPEG + b"original"
+    assert _upload(client, "keep.jpg", original, "image/jpeg").status_code == 200
+    target = os.path.join(settings.uploads_dir, "keep.jpg")
+
+    monkeypatch.setitem(settings.__dict__, "upload_max_bytes", 1024)
+    res = _upload(client, "keep.jpg", _JPEG + b"\x00" * 4096, "image/jpeg")
+
+    assert res.status_code == 413
+    with open(target, "rb") as fh:
+        assert fh.read() == original
+    assert not [n for n in os.listdir(settings.uploads_dir) if n.endswith(".part")]
@@ -0,0 +1,48 @@
+"""Cache-Control on /static/models — only versioned names are immutable."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.main import app
+
+settings = get_settings()
+_IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+def _model_url(name: str) -> str:
+    return f"/static/{settings.models_subdir}/{name}"
+
+
+@pytest.mark.parametrize("name", ["room.3f9a1c2e.glb", "room.v2.glb"])
+def test_versioned_models_are_immutable(client, name):
+    with open(os.path.join(settings.models_dir, name), "wb") as fh:
+        fh.write(b"glTF")
+
+    res = client.get(_model_url(name))
+    assert res.status_code == 200
+    assert res.headers["cache-control"] == _IMMUTABLE
+
+    res = client.get(_model_url(name), headers={"if-none-match": res.headers["etag"]})
+    assert res.status_code == 304
+    assert res.headers["cache-control"] == _IMMUTABLE
+
+
+def test_placeholder_model_revalidates_by_etag(client):
+    res = client.get(_model_url("room_default.glb"))
+    assert res.status_code == 200
+    assert "immutable" not in res.headers.get("cache-control", "")
+    assert "etag" in res.headers
+
+    res = client.get(_model_url("room_default.glb"), headers={"if-none-match": res.headers["etag"]})
+    assert res.status_code == 304